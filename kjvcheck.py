@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Equivalence checks for kjvsimple's fast paths against the simple code they
+replaced. Run after touching line breaking or the parser:
+
+    python3 kjvcheck.py                 # randomized cases
+    python3 kjvcheck.py --cases 200000  # the full run
+    python3 kjvcheck.py KJV.txt         # also compare parsers on real files
+
+Exits non-zero and prints the first failing case on a mismatch.
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import textwrap
+from collections import OrderedDict, defaultdict
+
+import kjvsimple
+
+# ---------- Line breaking ----------
+WRAP_PIECES = ["a", "bb", "well-favoured", "--", "-x", "x-", "Beer-sheba", "supercalifragilistic",
+               " ", "  ", "\t", "\n", "word,", "LORD;", "a-b-c", "ééé", "\xa0x"]
+
+def check_wrap(cases, rng):
+    # wrap_text() must equal textwrap.wrap with the reader's settings
+    for _ in range(cases):
+        text = "".join(rng.choice(WRAP_PIECES) for _ in range(rng.randint(0, 25)))
+        width = rng.randint(1, 40)
+        expected = textwrap.wrap(text, width=width, break_long_words=False, replace_whitespace=False)
+        got = kjvsimple.wrap_text(text, width)
+        if got != expected:
+            return f"wrap_text({text!r}, {width}):\n  expected {expected!r}\n  got      {got!r}"
+        if kjvsimple.count_chapter_lines([(1, text)], width + 2) != \
+                len(kjvsimple.format_chapter_lines_with_map([(1, text)], width + 2)[0]):
+            return f"count_chapter_lines disagrees with format_chapter_lines_with_map for {text!r}"
+    return None
+
+# ---------- Parser ----------
+REFERENCE_HEADER_RE = re.compile(r"^\$\$\s+([A-Za-z0-9]+)\s+(\d+):(\d+)\s*$")
+
+def reference_parse_kjv(path):
+    # The original line-by-line parser.
+    books = OrderedDict()
+    order = []
+    cur = {"book": None, "ch": None, "v": None, "buf": []}
+
+    def flush():
+        if cur["book"] is None:
+            return
+        book = cur["book"]; ch = int(cur["ch"]); v = int(cur["v"])
+        text = " ".join([ln.strip() for ln in cur["buf"]]).strip()
+        if book not in books:
+            books[book] = defaultdict(list)
+            order.append(book)
+        books[book][ch].append((v, text))
+        cur["buf"].clear()
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            line = raw.rstrip("\n").lstrip("\ufeff")
+            m = REFERENCE_HEADER_RE.match(line)
+            if m:
+                flush()
+                cur["book"], cur["ch"], cur["v"] = m.group(1), int(m.group(2)), int(m.group(3))
+                continue
+            if cur["book"] is not None:
+                cur["buf"].append(line)
+    flush()
+
+    for b in order:
+        chapters = books[b]
+        for ch in list(chapters.keys()):
+            chapters[ch] = sorted(chapters[ch], key=lambda t: t[0])
+        books[b] = OrderedDict(sorted(chapters.items(), key=lambda kv: kv[0]))
+    return OrderedDict((b, books[b]) for b in order)
+
+def same_books(a, b):
+    # equal content, book and chapter order, and mapping types
+    return (a == b and type(a) is type(b) and list(a) == list(b)
+            and all(list(a[k]) == list(b[k]) and type(a[k]) is type(b[k]) for k in a))
+
+PARSE_PIECES = ["$$ Ge 1:1", "$$ Ge 1:2 ", "$$  Ex\t2:3", "$$ Ge 1:1\r", "\ufeff$$ Ge 3:1", "$$Ge 1:1",
+                "$$ Ge 1:x", "text line", "  spaced  text  ", "", "\ufeffbom text", "\t", "a\x0bb", " x",
+                "$$ Ge 10:1", "$$ Re 1:1", "$$ Ge 2:5", "\r", "\u00e9\udcff", " $$ Ge 1:1", "$$ Ge \u0661:\u0662"]
+
+def check_parse(cases, rng, paths=()):
+    # parse_kjv() must equal the line-by-line parser: odd headers, BOMs, all
+    # newline styles, undecodable bytes, out-of-order verses and chapters
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "case.txt")
+        for _ in range(cases):
+            sep = rng.choice(["\n", "\r\n", "\r"])
+            text = sep.join(rng.choice(PARSE_PIECES) for _ in range(rng.randint(0, 15)))
+            text += rng.choice(["", sep])
+            with open(path, "w", encoding="utf-8", errors="surrogatepass", newline="") as f:
+                f.write(text)
+            if not same_books(reference_parse_kjv(path), kjvsimple.parse_kjv(path)):
+                return f"parse_kjv differs on {text!r}"
+    for path in paths:
+        if not same_books(reference_parse_kjv(path), kjvsimple.parse_kjv(path)):
+            return f"parse_kjv differs on {path}"
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Check kjvsimple's fast paths against reference code.")
+    parser.add_argument("--cases", type=int, default=20000, help="randomized cases per check")
+    parser.add_argument("--seed", type=int, default=5)
+    parser.add_argument("paths", nargs="*", help="text files to compare parsers on as well")
+    args = parser.parse_args()
+
+    checks = (
+        ("wrap", lambda rng: check_wrap(args.cases, rng)),
+        ("parse", lambda rng: check_parse(args.cases, rng, args.paths)),
+    )
+    failed = False
+    for name, check in checks:
+        problem = check(random.Random(args.seed))
+        print(f"{name}: {'ok' if problem is None else 'FAILED'}")
+        if problem is not None:
+            print(problem)
+            failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Replay scripted keystrokes against kjvsimple's reader on an in-memory fake
+curses screen, and report per-keystroke processing time and drawing cost.
+
+    python3 kjvreplay.py KJV.txt                      # built-in script
+    python3 kjvreplay.py KJV.txt -s session.txt --json run.json
+    python3 kjvreplay.py KJV.txt --compare run.json   # diff against an earlier run
+
+Script lines (one command per line, '#' starts a comment):
+    open Psalms 119      jump with the 'v' prompt
+    key DOWN 500         press a key N times (UP DOWN LEFT RIGHT PGUP PGDN HOME
+                         END ENTER ESC TAB BACKSPACE, or a single character)
+    type some text       type characters
+    search mercy         '/' query, default mode, open the first result
+    resize 100x30        change the screen size and send KEY_RESIZE
+"""
+import argparse
+import curses
+import json
+import os
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import kjvsimple
+
+DEFAULT_SCRIPT = """
+open Psalms 119
+key DOWN 500
+search mercy
+resize 100x30
+resize 80x24
+key PGDN 20
+key RIGHT 10
+"""
+
+KEY_NAMES = {
+    "UP": curses.KEY_UP, "DOWN": curses.KEY_DOWN, "LEFT": curses.KEY_LEFT, "RIGHT": curses.KEY_RIGHT,
+    "PGUP": curses.KEY_PPAGE, "PGDN": curses.KEY_NPAGE, "HOME": curses.KEY_HOME, "END": curses.KEY_END,
+    "ENTER": 10, "ESC": 27, "TAB": 9, "BACKSPACE": 127,
+}
+
+class ScriptDone(Exception):
+    pass
+
+# ---------- Fake curses ----------
+class Session:
+    # Shared state for every fake window: the screen size, the keys still to
+    # send, and the counters for the keystroke currently being processed.
+    def __init__(self, keys, rows=24, cols=80):
+        self.keys = list(reversed(keys))
+        self.rows = rows
+        self.cols = cols
+        self.samples = []
+        self._current = None
+        self._started = None
+        self._counts = None
+
+    def next_key(self):
+        self.finish_key()
+        if not self.keys:
+            raise ScriptDone()
+        label, key, resize = self.keys.pop()
+        if resize:
+            self.rows, self.cols = resize
+        self._current = label
+        self._counts = {"addnstr": 0, "refresh": 0, "bytes": 0}
+        self._started = time.perf_counter()
+        return key
+
+    def finish_key(self):
+        if self._current is not None:
+            elapsed = time.perf_counter() - self._started
+            self.samples.append((self._current, elapsed, self._counts))
+            self._current = None
+
+    def count(self, name, n=1):
+        if self._counts is not None:
+            self._counts[name] += n
+
+class FakeWindow:
+    def __init__(self, session, h=None, w=None, y=0, x=0):
+        self.session = session
+        self._size = (h, w) if h is not None else None
+        self.origin = (y, x)
+
+    def getmaxyx(self):
+        if self._size is None:
+            return self.session.rows, self.session.cols
+        return self._size
+
+    def addnstr(self, y, x, s, n, attr=0):
+        rows, cols = self.getmaxyx()
+        if not (0 <= y < rows and 0 <= x < cols):
+            raise curses.error("addnstr() returned ERR")
+        self.session.count("addnstr")
+        self.session.count("bytes", len(s[:max(0, n)].encode("utf-8")))
+
+    def addstr(self, y, x, s, attr=0):
+        self.addnstr(y, x, s, len(s), attr)
+
+    def refresh(self):
+        self.session.count("refresh")
+
+    def getch(self):
+        return self.session.next_key()
+
+    def keypad(self, flag):
+        pass
+
+    def attron(self, attr):
+        pass
+
+    def attroff(self, attr):
+        pass
+
+    def box(self):
+        pass
+
+    def clear(self):
+        pass
+
+    def erase(self):
+        pass
+
+    def move(self, y, x):
+        pass
+
+class fake_curses:
+    # Swap the curses calls kjvsimple makes for in-memory versions.
+    def __init__(self, session):
+        self.session = session
+        self.saved = {}
+
+    def __enter__(self):
+        session = self.session
+        fakes = {
+            "newwin": lambda h, w, y=0, x=0: FakeWindow(session, h, w, y, x),
+            "color_pair": lambda n: n << 8,
+            "init_pair": lambda *args: None,
+            "start_color": lambda: None,
+            "use_default_colors": lambda: None,
+            "curs_set": lambda visibility: None,
+        }
+        for name, fn in fakes.items():
+            self.saved[name] = getattr(curses, name)
+            setattr(curses, name, fn)
+        return FakeWindow(session)
+
+    def __exit__(self, *exc):
+        for name, fn in self.saved.items():
+            setattr(curses, name, fn)
+        return False
+
+# ---------- Scripts ----------
+def compile_script(text):
+    # -> list of (label, key, resize) with resize a (rows, cols) pair or None
+    keys = []
+
+    def press(label, key, resize=None):
+        keys.append((label, key, resize))
+
+    def type_text(label, s):
+        for c in s:
+            press(label, ord(c))
+
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        line = raw.split("#", 1)[0].strip()
+        if not line:
+            continue
+        cmd, _, arg = line.partition(" ")
+        arg = arg.strip()
+        if cmd == "key":
+            name, _, times = arg.partition(" ")
+            key = KEY_NAMES.get(name.upper(), ord(name) if len(name) == 1 else None)
+            if key is None:
+                raise ValueError(f"line {lineno}: unknown key {name!r}")
+            for _ in range(int(times or 1)):
+                press(f"key {name}", key)
+        elif cmd == "type":
+            type_text("type", arg)
+        elif cmd == "open":
+            press("open", ord("v"))
+            type_text("open", arg)
+            press("open", 10)
+        elif cmd == "search":
+            press("search", ord("/"))
+            type_text("search", arg)
+            press("search", 10)  # query
+            press("search", 10)  # default mode
+            press("search", 10)  # first result (or dismiss "No results")
+        elif cmd == "resize":
+            cols, _, rows = arg.partition("x")
+            press("resize", curses.KEY_RESIZE, (int(rows), int(cols)))
+        else:
+            raise ValueError(f"line {lineno}: unknown command {cmd!r}")
+    return keys
+
+def replay(bible, keys, rows=24, cols=80, start=("Ge", 1)):
+    session = Session(keys, rows=rows, cols=cols)
+    with fake_curses(session) as stdscr:
+        try:
+            kjvsimple.reader(stdscr, bible, *start)
+        except ScriptDone:
+            pass
+    session.finish_key()
+    return session.samples
+
+# ---------- Reports ----------
+def percentile(values, q):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+def summarize(samples):
+    groups = OrderedDict()
+    for label, elapsed, counts in samples:
+        groups.setdefault(label, []).append((elapsed, counts))
+    groups["ALL"] = [(elapsed, counts) for _, elapsed, counts in samples]
+    report = OrderedDict()
+    for label, rows in groups.items():
+        ms = [e * 1000 for e, _ in rows]
+        n = len(rows)
+        report[label] = OrderedDict([
+            ("keys", n),
+            ("p50_ms", round(percentile(ms, 50), 3)),
+            ("p90_ms", round(percentile(ms, 90), 3)),
+            ("p99_ms", round(percentile(ms, 99), 3)),
+            ("max_ms", round(max(ms), 3) if ms else 0.0),
+            ("addnstr_per_key", round(sum(c["addnstr"] for _, c in rows) / n, 1)),
+            ("refresh_per_key", round(sum(c["refresh"] for _, c in rows) / n, 2)),
+            ("bytes_per_key", round(sum(c["bytes"] for _, c in rows) / n, 1)),
+        ])
+    return report
+
+COLUMNS = ("keys", "p50_ms", "p90_ms", "p99_ms", "max_ms", "addnstr_per_key", "refresh_per_key", "bytes_per_key")
+
+def format_report(report, baseline=None):
+    lines = [f"{'step':<14}" + "".join(f"{c:>17}" for c in COLUMNS)]
+    for label, row in report.items():
+        cells = []
+        for c in COLUMNS:
+            cell = f"{row[c]}"
+            if baseline and label in baseline and c != "keys":
+                old = baseline[label][c]
+                if old:
+                    cell += f" ({(row[c] - old) / old:+.0%})"
+            cells.append(f"{cell:>17}")
+        lines.append(f"{label:<14}" + "".join(cells))
+    return "\n".join(lines)
+
+def main():
+    default_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "KJV.txt")
+    parser = argparse.ArgumentParser(description="Replay keystrokes against the kjvsimple reader headlessly.")
+    parser.add_argument("path", nargs="?", default=default_path, help="path to KJV.txt")
+    parser.add_argument("-s", "--script", help="script file (default: built-in session)")
+    parser.add_argument("--size", default="80x24", help="initial screen size, COLSxROWS")
+    parser.add_argument("--snapshot", metavar="FILE", help="replay on a shared corpus snapshot")
+    parser.add_argument("--cold", action="store_true", help="do not build search indexes before replaying")
+    parser.add_argument("--json", help="write the report as JSON")
+    parser.add_argument("--compare", help="JSON report of an earlier run to compare against")
+    args = parser.parse_args()
+
+    if args.script:
+        with open(args.script, "r", encoding="utf-8") as f:
+            script = f.read()
+    else:
+        script = DEFAULT_SCRIPT
+    cols, _, rows = args.size.partition("x")
+    bible = kjvsimple.open_corpus(args.path, args.snapshot)
+    if not args.cold:
+        kjvsimple.prepare_corpus(bible)
+    keys = compile_script(script)
+    with tempfile.TemporaryDirectory() as tmp:
+        # keep the user's favorites file out of the run
+        kjvsimple.FAV_FILE = os.path.join(tmp, "favorites.json")
+        samples = replay(bible, keys, rows=int(rows), cols=int(cols))
+    report = summarize(samples)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print(format_report(report, baseline))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
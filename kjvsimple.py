@@ -5,10 +5,19 @@ import curses
 import textwrap
 import re
 import json
+import html
+import argparse
 import os
 import sys
 import time
-from collections import defaultdict, OrderedDict
+import threading
+import mmap
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from functools import lru_cache
+from itertools import accumulate
+from collections import Counter, defaultdict, OrderedDict
+from collections.abc import Mapping
 
 CP_BORDER = 1
 CP_TITLE = 2
@@ -44,19 +53,180 @@ def load_chapter_lines(bible, book_key, chapter_num, width):
     lines, line_to_verse = format_chapter_lines_with_map(chapter, width)
     return chapter, lines, line_to_verse
 
+# ---------- Background work ----------
+class BackgroundTask:
+    # Runs fn(*args) on a daemon thread; result() waits and re-raises errors.
+    def __init__(self, fn, *args):
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(fn, args), daemon=True)
+        self._thread.start()
+
+    def _run(self, fn, args):
+        try:
+            self._result = fn(*args)
+        except Exception as e:
+            self._error = e
+        finally:
+            self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        # True once finished; False if still running after timeout seconds
+        return self._done.wait(timeout)
+
+    def result(self):
+        self._done.wait()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+class ChapterCache:
+    """
+    LRU of formatted chapters keyed by (book, chapter, width).
+    prefetch() queues the neighbours of the chapter being read for a worker
+    thread; a newer prefetch or close() drops whatever is still pending.
+    """
+    def __init__(self, bible, max_entries=24):
+        self.bible = bible
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._cond = threading.Condition()
+        self._jobs = []
+        self._closed = False
+        self._worker = None
+
+    def get(self, book_key, chapter_num, width):
+        key = (book_key, chapter_num, width)
+        with self._cond:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = load_chapter_lines(self.bible, book_key, chapter_num, width)
+        self._store(key, entry)
+        return entry
+
+    def _store(self, key, entry):
+        with self._cond:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def prefetch(self, book_key, chapter_num, width):
+        around = (prev_chapter(self.bible, book_key, chapter_num),
+                  next_chapter(self.bible, book_key, chapter_num))
+        with self._cond:
+            if self._closed:
+                return
+            self._jobs = [(b, ch, width) for b, ch in filter(None, around)
+                          if (b, ch, width) not in self._entries]
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, daemon=True)
+                self._worker.start()
+            self._cond.notify()
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._jobs = []
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._jobs and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                key = self._jobs.pop(0)
+                if key in self._entries:
+                    continue
+            self._store(key, load_chapter_lines(self.bible, *key))
+
+class Favorites:
+    """
+    Favorite verses kept in canonical verse order and bucketed per chapter,
+    so drawing a chapter only touches that chapter's entries. Supports the
+    same lookups and updates as the old {(book, chapter, verse): data} dict.
+    """
+    def __init__(self, entries=()):
+        self._buckets = {}
+        for (b, ch, v), data in entries:
+            self._buckets.setdefault((b, ch), {})[v] = data
+        self._order = sorted(_canonical_key(b, ch, v)
+                             for (b, ch), bucket in self._buckets.items() for v in bucket)
+
+    def __len__(self):
+        return len(self._order)
+
+    def __contains__(self, key):
+        b, ch, v = key
+        return v in self._buckets.get((b, ch), ())
+
+    def __getitem__(self, key):
+        b, ch, v = key
+        return self._buckets[(b, ch)][v]
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __setitem__(self, key, data):
+        b, ch, v = key
+        bucket = self._buckets.setdefault((b, ch), {})
+        if v not in bucket:
+            insort(self._order, _canonical_key(b, ch, v))
+        bucket[v] = data
+
+    def __delitem__(self, key):
+        b, ch, v = key
+        bucket = self._buckets[(b, ch)]
+        del bucket[v]
+        if not bucket:
+            del self._buckets[(b, ch)]
+        ck = _canonical_key(b, ch, v)
+        del self._order[bisect_left(self._order, ck)]
+
+    def __iter__(self):
+        return (ck[1:] for ck in self._order)
+
+    def keys(self):
+        return iter(self)
+
+    def items(self):
+        for key in self:
+            yield key, self[key]
+
+    def chapter(self, book_key, chapter_num):
+        # {verse: data} for one chapter; empty if it has no favorites
+        return self._buckets.get((book_key, chapter_num), {})
+
+    def filtered(self, color=None, book=None):
+        # Keys in canonical order, optionally limited to one color and/or book
+        return [key for key in self
+                if (book is None or key[0] == book)
+                and (color is None or self[key].get("color") == color)]
+
+def _canonical_key(b, ch, v):
+    return (BOOK_ORDER.get(b, len(BOOK_ORDER)), b, ch, v)
+
 def load_favorites():
     if not os.path.exists(FAV_FILE):
-        return {}
+        return Favorites()
     try:
         with open(FAV_FILE, "r", encoding="utf-8") as f:
             raw = json.load(f)
-            return {
-                parse_verse_key(k): v
+            return Favorites(
+                (parse_verse_key(k), v)
                 for k, v in raw.items()
-            }
+            )
     except Exception as e:
         print(f"Failed to load favorites: {e}")
-        return {}
+        return Favorites()
 
 def save_favorites(favorites):
     try:
@@ -92,26 +262,74 @@ def move_cursor_to_verse_line(line_to_verse, current_line, direction):
     return max(0, min(i, len(line_to_verse)-1))
 
 
+class LazyItems:
+    # Sequence for menu() that builds each label on first use, so only the
+    # rows actually shown are ever formatted.
+    def __init__(self, count, build):
+        self._count = count
+        self._build = build
+        self._built = {}
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i):
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        if i not in self._built:
+            self._built[i] = self._build(i)
+        return self._built[i]
+
+def favorite_text(bible, key):
+    vid = verse_index(bible).id_of(*key)
+    return "" if vid is None else verse_index(bible).texts[vid]
+
 def show_favorites_menu(stdscr, bible, favorites):
-    keys = list(favorites.keys())
-    if not keys:
+    if not len(favorites):
         msgbox(stdscr, "No favorites", "You haven't saved any favorite verses yet.")
         return None
 
-    items = []
-    for b, ch, v in keys:
-        bk = BOOK_NAMES.get(b, b)
-        text = next((t for vn, t in bible[b][ch] if vn == v), "")
-        snippet = text[:60].replace("\n", " ")
-        items.append(f"{bk} {ch}:{v} — {snippet}")
-
-    idx, _ = menu(stdscr, "Favorites", "Select a favorite to jump to or delete:", items, width=80, height=20)
-    if idx is None:
-        return None
+    color = book = None
+    color_names = {c: name for name, c in ALLOWED_COLORS}
+    while True:
+        keys = favorites.filtered(color=color, book=book)
+        actions = ["[ Filter by color ]", "[ Filter by book ]"]
+        if color is not None or book is not None:
+            actions.append("[ Show all ]")
+        n_actions = len(actions)
+
+        def label(i):
+            if i < n_actions:
+                return actions[i]
+            b, ch, v = keys[i - n_actions]
+            snippet = favorite_text(bible, (b, ch, v))[:60].replace("\n", " ")
+            return f"{BOOK_NAMES.get(b, b)} {ch}:{v} — {snippet}"
+
+        shown = [f"{len(keys)} of {len(favorites)} favorites"]
+        if color is not None:
+            shown.append(f"color: {color_names.get(color, color)}")
+        if book is not None:
+            shown.append(f"book: {BOOK_NAMES.get(book, book)}")
+        message = f"Select a favorite to jump to or delete ({', '.join(shown)}):"
+        idx, _ = menu(stdscr, "Favorites", message, LazyItems(n_actions + len(keys), label),
+                      width=80, height=20, start_index=n_actions if keys else 0)
+        if idx is None:
+            return None
+        if idx == 0:
+            color = choose_highlight_color(stdscr)
+            continue
+        if idx == 1:
+            books = list(OrderedDict.fromkeys(b for b, _, _ in favorites))
+            book = choose_book(stdscr, books)
+            continue
+        if idx == 2 and n_actions == 3:
+            color = book = None
+            continue
+        break
 
-    selected_key = keys[idx]
+    selected_key = keys[idx - n_actions]
     b, ch, v = selected_key
-    verse_text = next((t for vn, t in bible[b][ch] if vn == v), "")
+    verse_text = favorite_text(bible, selected_key)
 
     choice = menu(
         stdscr,
@@ -181,11 +399,66 @@ def wrap_paragraphs(text, width):
         if not para.strip():
             lines.append("")
             continue
-        lines.extend(textwrap.wrap(
-            para, width=width, break_long_words=False, replace_whitespace=False
-        ) or [""])
+        lines.extend(wrap_text(para, width) or [""])
     return lines
 
+# ---------- Line breaking ----------
+# Same chunking as textwrap (tabs expanded, split on whitespace and hyphens),
+# done once per text; each width is then a greedy walk over prefix sums.
+_WORDSEP_RE = textwrap.TextWrapper.wordsep_re
+
+@lru_cache(maxsize=65536)
+def text_layout(text):
+    # (text with tabs expanded, chunk boundary offsets, per-chunk blank flags)
+    # in flat arrays; a line is the slice of text between two boundaries.
+    expanded = text.expandtabs()
+    chunks = [c for c in _WORDSEP_RE.split(expanded) if c]
+    cum = array("H" if len(expanded) < 0x10000 else "I", accumulate(map(len, chunks), initial=0))
+    blank = bytes([not c.strip() for c in chunks])
+    return expanded, cum, blank
+
+def break_spans(layout, width):
+    # Mirrors textwrap.wrap(..., break_long_words=False, replace_whitespace=False)
+    # and returns (start, end) chunk ranges, one per output line.
+    _, cum, blank = layout
+    n = len(blank)
+    spans = []
+    i = 0
+    while i < n:
+        if spans and blank[i]:
+            i += 1
+            if i == n:
+                break
+        j = bisect_right(cum, cum[i] + width, i) - 1
+        if j == i:
+            j += 1  # word longer than the line: give it a line of its own
+        end = j - 1 if blank[j - 1] else j
+        if end > i:
+            spans.append((i, end))
+        i = j
+    return spans
+
+def wrap_text(text, width):
+    layout = text_layout(text)
+    expanded, cum, _ = layout
+    return [expanded[cum[a]:cum[b]] for a, b in break_spans(layout, width)]
+
+def prepare_layouts(bible):
+    for chapters in bible.values():
+        for verses in chapters.values():
+            for _, text in verses:
+                text_layout(text)
+
+def prepare_corpus(bible):
+    # Load-time work that can finish in the background while the user reads.
+    # A prepared corpus (a snapshot) stores all of it already.
+    if getattr(bible, "prepared", False):
+        return
+    prepare_layouts(bible)
+    lexicon(bible)
+    stem_index(bible)
+    positional_index(bible)
+
 # ---------- Simple dialogs ----------
 def button_row(win, buttons, focus_idx, y, x, maxlen=None):
     cx = x
@@ -435,45 +708,450 @@ for code, name in BOOK_NAMES.items():
     NAME_TO_CODE[name.lower()] = code
     NAME_TO_CODE[re.sub(r"\s+", "", name.lower())] = code
 
-HEADER_RE = re.compile(r"^\$\$\s+([A-Za-z0-9]+)\s+(\d+):(\d+)\s*$")
+# canonical book order, for sorting references
+BOOK_ORDER = {code: i for i, code in enumerate(BOOK_NAMES)}
+
+# Verse headers ("$$ Ge 1:1" on a line of their own) in a whole buffer with
+# a newline prepended. The literal "\n$$" prefix lets re skip ahead quickly;
+# [^\S\n] is \s without crossing lines.
+HEADER_SPLIT_RE = re.compile(r"\n\$\$[^\S\n]+([A-Za-z0-9]+)[^\S\n]+(\d+):(\d+)[^\S\n]*(?=\n|\Z)")
+BOM_LINE_RE = re.compile(r"^\ufeff+", re.M)
 
 def parse_kjv(path):
+    # One bulk read (same decoding and newline handling as reading line by
+    # line) and one regex split; the tables are then built from C-level
+    # slices and maps rather than per-line Python work.
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        data = f.read()
+    if "\ufeff" in data:
+        data = BOM_LINE_RE.sub("", data)
+    return _build_books(HEADER_SPLIT_RE.split("\n" + data))
+
+def _build_books(parts):
+    # parts is [preamble, book, ch, v, body, book, ch, v, body, ...]
+    numbers = {n: int(n) for n in set(parts[2::4]) | set(parts[3::4])}
+    book_of = parts[1::4]
+    ch_of = [numbers[n] for n in parts[2::4]]
+    v_of = [numbers[n] for n in parts[3::4]]
+    # Each body is "\n" + the verse's lines joined by "\n"
+    texts = [body.strip() for body in parts[4::4]]
+    for i, text in enumerate(texts):
+        if "\n" in text:
+            texts[i] = " ".join([ln.strip() for ln in text.split("\n")])
+    verses = list(zip(v_of, texts))
+
+    # Split into runs of one (book, chapter); the input is in canonical
+    # order when no chapter has two runs and the numbers never go backwards.
+    starts = []
+    run_book = run_ch = None
+    for i, ch in enumerate(ch_of):
+        if ch != run_ch or book_of[i] != run_book:
+            starts.append(i)
+            run_book, run_ch = book_of[i], ch
+    starts.append(len(ch_of))
+    in_order = True
     books = OrderedDict()
-    order = []
-    cur = {"book": None, "ch": None, "v": None, "buf": []}
+    seen = set()
+    prev_book = prev_ch = None
+    for pos, end in zip(starts, starts[1:]):
+        book, ch = book_of[pos], ch_of[pos]
+        if book != prev_book:
+            if book in books:
+                in_order = False
+            else:
+                books[book] = []
+            prev_book = book
+        elif ch < prev_ch or (book, ch) in seen:
+            in_order = False
+        seen.add((book, ch))
+        prev_ch = ch
+        if in_order:
+            for i in range(pos + 1, end):
+                if v_of[i] < v_of[i - 1]:
+                    in_order = False
+                    break
+        books[book].append((ch, verses[pos:end]))
+
+    # KJV.txt is already in canonical order; only sort when it is not
+    if in_order:
+        for book, chapters in books.items():
+            books[book] = OrderedDict(chapters)
+        return books
+    books = OrderedDict((book, defaultdict(list)) for book in books)
+    for book, ch, verse in zip(book_of, ch_of, verses):
+        books[book][ch].append(verse)
+    for book, chapters in books.items():
+        for ch in chapters:
+            chapters[ch].sort(key=lambda t: t[0])
+        books[book] = OrderedDict(sorted(chapters.items(), key=lambda kv: kv[0]))
+    return books
+
+# ---------- Shared corpus snapshot ----------
+# A snapshot is the parsed corpus and its search indexes in flat arrays that
+# every reader process maps read-only, so the OS page cache holds one copy
+# for all of them:
+#   magic, header length, JSON header (chapter table, section offsets),
+#   then 8-byte aligned sections of native arrays and UTF-8 bytes, placed
+#   relative to the first 8-byte boundary after the header.
+# Keyed sections (words, stems, deletions) are sorted UTF-8 keys with an
+# offset array, looked up by binary search.
+SNAPSHOT_MAGIC = b"KJVSNAP2"
+SNAPSHOT_CODES = "BHI"
+
+def source_stamp(path):
+    # (size, mtime_ns) of the text a snapshot was built from, or None if missing
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+def _snapshot_base(header_len):
+    # sections start at the first 8-byte boundary after the header
+    end = len(SNAPSHOT_MAGIC) + 8 + header_len
+    return end + -end % 8
+
+def _keyed(data, name, keys):
+    # sorted str keys -> "<name>_keys" UTF-8 blob and "<name>_key_off" offsets
+    encoded = [k.encode("utf-8") for k in keys]
+    data[name + "_key_off"] = array("I", accumulate(map(len, encoded), initial=0))
+    data[name + "_keys"] = b"".join(encoded)
+
+def _grouped(data, name, groups):
+    # list of int lists -> "<name>" flat array and "<name>_off" offsets
+    data[name + "_off"] = array("I", accumulate(map(len, groups), initial=0))
+    data[name] = array("I", [x for g in groups for x in g])
+
+def write_snapshot(bible, path, source=None):
+    # Written to a temporary file and renamed, so readers never map a partial file.
+    index = VerseIndex(bible)
+    data = {"verse_nums": array("I", [v for _, _, v in index.refs])}
+    texts = [t.encode("utf-8") for t in index.texts]
+    data["text_off"] = array("I", accumulate(map(len, texts), initial=0))
+    data["text"] = b"".join(texts)
+
+    # line-breaking layouts (see text_layout), without filling its cache
+    layouts = [text_layout.__wrapped__(t) for t in index.texts]
+    cum = [x for _, c, _ in layouts for x in c]
+    data["layout_off"] = array("I", accumulate((len(b) for _, _, b in layouts), initial=0))
+    data["layout_cum"] = array("H" if max(cum, default=0) < 0x10000 else "I", cum)
+    data["layout_blank"] = b"".join(b for _, _, b in layouts)
+    del layouts, cum
+
+    # PositionalIndex postings
+    postings = defaultdict(list)
+    for vid, text in enumerate(index.texts):
+        for w in set(verse_tokens(text)):
+            postings[w].append(vid)
+    words = sorted(postings)
+    _keyed(data, "word", words)
+    _grouped(data, "word_postings", [postings[w] for w in words])
+
+    # StemIndex: a stem's verses are the union of its forms' verses
+    forms = defaultdict(list)
+    for w in words:
+        forms[kjv_stem(w)].append(w)
+    stems = sorted(forms)
+    _keyed(data, "stem", stems)
+    _grouped(data, "stem_postings", [sorted(set().union(*(postings[w] for w in forms[s]))) for s in stems])
+    stem_forms = [" ".join(forms[s]).encode("utf-8") for s in stems]
+    data["stem_forms_off"] = array("I", accumulate(map(len, stem_forms), initial=0))
+    data["stem_forms"] = b"".join(stem_forms)
+    del postings, forms
+
+    # Lexicon: word counts alongside the words, deletions as word numbers
+    lex = Lexicon(bible)
+    max_edits = lex.max_edits
+    word_no = {w: i for i, w in enumerate(words)}
+    data["word_count"] = array("I", [lex.counts[w] for w in words])
+    deletes = sorted(lex.deletes)
+    _keyed(data, "del", deletes)
+    _grouped(data, "del_words", [[word_no[ws]] if isinstance(ws, str) else [word_no[w] for w in ws]
+                                 for ws in map(lex.deletes.__getitem__, deletes)])
+    del lex, deletes, word_no
+
+    books = [[b, [[ch, index.chapter_start[(b, ch)], len(index.chapter_verses[(b, ch)])]
+                  for ch in chapters]]
+             for b, chapters in index.book_chapters.items()]
+    sections, pos = {}, 0
+    for name, blob in data.items():
+        pos += -pos % 8
+        sections[name] = [pos, len(blob) * getattr(blob, "itemsize", 1), getattr(blob, "typecode", "B")]
+        pos += sections[name][1]
+    header = json.dumps({"books": books, "byteorder": sys.byteorder, "source": source,
+                         "itemsize": {c: array(c).itemsize for c in SNAPSHOT_CODES},
+                         "max_edits": max_edits,
+                         "sections": sections}, separators=(",", ":")).encode("utf-8")
+    base = _snapshot_base(len(header))
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(len(header).to_bytes(8, "little"))
+            f.write(header)
+            for name, blob in data.items():
+                f.write(b"\0" * (base + sections[name][0] - f.tell()))
+                f.write(blob)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+def read_snapshot_header(f):
+    # -> (header, base) from a snapshot file open in binary mode
+    start = len(SNAPSHOT_MAGIC) + 8
+    head = f.read(start)
+    if len(head) < start or head[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise ValueError(f"{f.name} is not a corpus snapshot")
+    n = int.from_bytes(head[len(SNAPSHOT_MAGIC):], "little")
+    header = json.loads(f.read(n))
+    if header["byteorder"] != sys.byteorder or \
+            header["itemsize"] != {c: array(c).itemsize for c in SNAPSHOT_CODES}:
+        raise ValueError(f"{f.name} was built on an incompatible platform")
+    return header, _snapshot_base(n)
+
+class CorpusSnapshot(Mapping):
+    """
+    Read-only bible mapping over a snapshot file: book -> chapter -> list of
+    (verse, text), decoded from the mapped pages on access. Only the chapter
+    table is held as Python objects; VerseIndex, PositionalIndex, StemIndex
+    and Lexicon read their tables straight from the map.
+    """
+    # layouts and search tables are in the file: prepare_corpus() skips it,
+    # which keeps per-process memory small
+    prepared = True
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            header, base = read_snapshot_header(f)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._map)
+        sec = {}
+        for name, (pos, size, code) in header["sections"].items():
+            if base + pos + size > len(buf):
+                raise ValueError(f"{path} is truncated")
+            sec[name] = buf[base + pos:base + pos + size].cast(code)
+        self.source = header["source"]
+        self.max_edits = header["max_edits"]
+        self.verse_nums = sec["verse_nums"]
+        self._text_off = sec["text_off"]
+        self._text = sec["text"]
+        self._layout_off = sec["layout_off"]
+        self._layout_cum = sec["layout_cum"]
+        self._layout_blank = sec["layout_blank"]
+        self.texts = SnapshotTexts(self)
+        words = SnapshotTable(sec["word_keys"], sec["word_key_off"])
+        self.postings = words.values(sec["word_postings"], sec["word_postings_off"])
+        self.word_counts = words.values(sec["word_count"])
+        self.deletions = SnapshotTable(sec["del_keys"], sec["del_key_off"]).values(
+            sec["del_words"], sec["del_words_off"],
+            lambda ids: words.key(ids[0]) if len(ids) == 1 else tuple(map(words.key, ids)))
+        stems = SnapshotTable(sec["stem_keys"], sec["stem_key_off"])
+        self.stem_postings = stems.values(sec["stem_postings"], sec["stem_postings_off"])
+        self.stem_forms = stems.values(sec["stem_forms"], sec["stem_forms_off"],
+                                       lambda blob: str(blob, "utf-8").split())
+        self._books = OrderedDict()
+        self._chapter_starts = []
+        self._chapter_keys = []
+        for b, chapters in header["books"]:
+            self._books[b] = SnapshotBook(self, chapters)
+            for ch, first, _ in chapters:
+                self._chapter_starts.append(first)
+                self._chapter_keys.append((b, ch))
+        self.refs = SnapshotRefs(self)
+
+    def __getitem__(self, book_key):
+        return self._books[book_key]
+
+    def __iter__(self):
+        return iter(self._books)
+
+    def __len__(self):
+        return len(self._books)
+
+    def text(self, vid):
+        off = self._text_off
+        return str(self._text[off[vid]:off[vid + 1]], "utf-8")
+
+    def layout(self, vid):
+        # text_layout() of a verse as views of the map; the text is left out
+        lo, hi = self._layout_off[vid], self._layout_off[vid + 1]
+        return None, self._layout_cum[lo + vid:hi + vid + 1], self._layout_blank[lo:hi]
+
+    def chapter_of(self, vid):
+        return self._chapter_keys[bisect_right(self._chapter_starts, vid) - 1]
+
+    def chapter_line_count(self, book_key, chapter_num, width):
+        # count_chapter_lines() from the stored layouts: nothing decoded or cached
+        first, n = self._books[book_key].spans[chapter_num]
+        return count_layout_lines(((self.verse_nums[vid], self.layout(vid))
+                                   for vid in range(first, first + n)), width)
+
+class SnapshotBook(Mapping):
+    # chapter -> list of (verse, text); chapters are decoded on each access
+    def __init__(self, snapshot, chapters):
+        self._snapshot = snapshot
+        self.spans = OrderedDict((ch, (first, n)) for ch, first, n in chapters)
+
+    def __getitem__(self, chapter_num):
+        first, n = self.spans[chapter_num]
+        snap = self._snapshot
+        return [(snap.verse_nums[vid], snap.text(vid)) for vid in range(first, first + n)]
+
+    def __iter__(self):
+        return iter(self.spans)
+
+    def __len__(self):
+        return len(self.spans)
+
+class SnapshotTexts:
+    # verse id -> text, the snapshot's stand-in for VerseIndex.texts
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot.verse_nums)
+
+    def __getitem__(self, vid):
+        if not 0 <= vid < len(self):
+            raise IndexError(vid)
+        return self._snapshot.text(vid)
+
+class SnapshotTokens(SnapshotTexts):
+    # verse id -> word tokens, recomputed on each lookup rather than kept
+    def __getitem__(self, vid):
+        return verse_tokens(SnapshotTexts.__getitem__(self, vid))
+
+class SnapshotRefs:
+    # verse id -> (book, chapter, verse), the stand-in for VerseIndex.refs
+    def __init__(self, snapshot):
+        self._snapshot = snapshot
+
+    def __len__(self):
+        return len(self._snapshot.verse_nums)
+
+    def __getitem__(self, vid):
+        if not 0 <= vid < len(self):
+            raise IndexError(vid)
+        return self._snapshot.chapter_of(vid) + (self._snapshot.verse_nums[vid],)
+
+class SnapshotTable:
+    # Sorted UTF-8 keys in a mapped blob; find() is a binary search.
+    def __init__(self, keys, key_off):
+        self._keys = keys
+        self._key_off = key_off
+
+    def __len__(self):
+        return len(self._key_off) - 1
+
+    def key(self, i):
+        return str(self._keys[self._key_off[i]:self._key_off[i + 1]], "utf-8")
+
+    def find(self, key):
+        key = key.encode("utf-8")
+        keys, off = self._keys, self._key_off
+        lo, hi = 0, len(self)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(keys[off[mid]:off[mid + 1]]) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self) and bytes(keys[off[lo]:off[lo + 1]]) == key:
+            return lo
+        return None
 
-    def flush():
-        if cur["book"] is None:
-            return
-        book = cur["book"]; ch = int(cur["ch"]); v = int(cur["v"])
-        text = " ".join([ln.strip() for ln in cur["buf"]]).strip()
-        if book not in books:
-            books[book] = defaultdict(list)
-            order.append(book)
-        books[book][ch].append((v, text))
-        cur["buf"].clear()
+    def values(self, data, offsets=None, decode=None):
+        return SnapshotValues(self, data, offsets, decode)
+
+class SnapshotValues:
+    # dict-like view: key -> data[offsets[i]:offsets[i + 1]] (or data[i] when
+    # there is one value per key), optionally decoded
+    def __init__(self, table, data, offsets, decode):
+        self._table = table
+        self._data = data
+        self._offsets = offsets
+        self._decode = decode
+
+    def get(self, key, default=None):
+        i = self._table.find(key)
+        if i is None:
+            return default
+        if self._offsets is None:
+            value = self._data[i]
+        else:
+            value = self._data[self._offsets[i]:self._offsets[i + 1]]
+        return value if self._decode is None else self._decode(value)
 
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-      for raw in f:
-          line = raw.rstrip("\n").lstrip("\ufeff")
-          m = HEADER_RE.match(line)
-          if m:
-              flush()
-              cur["book"], cur["ch"], cur["v"] = m.group(1), int(m.group(2)), int(m.group(3))
-              continue
-          if cur["book"] is not None:
-              cur["buf"].append(line)
-    flush()
-
-    for b in order:
-        chapters = books[b]
-        for ch in list(chapters.keys()):
-            verses = sorted(chapters[ch], key=lambda t: t[0])
-            chapters[ch] = verses
-        books[b] = OrderedDict(sorted(chapters.items(), key=lambda kv: kv[0]))
-
-    ordered_books = OrderedDict((b, books[b]) for b in order)
-    return ordered_books
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self._table.find(key) is not None
+
+def open_corpus(path, snapshot=None):
+    """
+    The parsed text, or with a snapshot path the shared snapshot of it,
+    (re)built first when it is missing or older than the text. When the
+    snapshot cannot be written the parsed text is returned instead.
+    """
+    if snapshot is None:
+        return parse_kjv(path)
+    stamp = source_stamp(path)
+    if stamp is None:
+        # no text to rebuild from: the snapshot is all there is
+        return CorpusSnapshot(snapshot)
+    current = _current_snapshot(snapshot, stamp)
+    if current is not None:
+        return current
+    return _rebuild_snapshot(path, snapshot, stamp)
+
+def _current_snapshot(snapshot, stamp):
+    # The mapped snapshot if it was built from this text, else None. Only the
+    # header is read to decide; nothing is mapped until it is current.
+    try:
+        with open(snapshot, "rb") as f:
+            header, _ = read_snapshot_header(f)
+        if header["source"] == stamp:
+            return CorpusSnapshot(snapshot)
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _rebuild_snapshot(path, snapshot, stamp):
+    # One process rebuilds while holding a lock on snapshot + ".lock"; the
+    # others wait on it and then map the new file instead of each parsing
+    # the text too. Without fcntl (Windows) concurrent rebuilds just race,
+    # which write_snapshot's os.replace keeps safe.
+    try:
+        import fcntl
+    except ImportError:
+        fcntl = None
+    try:
+        lock = open(snapshot + ".lock", "a")
+    except OSError:
+        return parse_kjv(path)  # e.g. a directory we cannot write to
+    with lock:
+        if fcntl is not None:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            except OSError:
+                return parse_kjv(path)
+        current = _current_snapshot(snapshot, stamp)
+        if current is not None:
+            return current
+        bible = parse_kjv(path)
+        try:
+            write_snapshot(bible, snapshot, source=stamp)
+            return CorpusSnapshot(snapshot)
+        except OSError:
+            return bible
 
 # ---------- Formatting chapter with verse-line mapping ----------
 def format_chapter_lines_with_map(chapter_verses, width):
@@ -487,7 +1165,7 @@ def format_chapter_lines_with_map(chapter_verses, width):
     for vnum, text in chapter_verses:
         prefix = f"{vnum} "
         wrap_width = max(1, width - len(prefix))
-        wrapped = textwrap.wrap(text, width=wrap_width, break_long_words=False, replace_whitespace=False)
+        wrapped = wrap_text(text, wrap_width)
         if not wrapped:
             lines.append(prefix)
             line_to_verse.append(vnum)
@@ -506,6 +1184,26 @@ def format_chapter_lines_with_map(chapter_verses, width):
         line_to_verse.pop()
     return lines, line_to_verse
 
+def count_chapter_lines(chapter_verses, width):
+    # len(format_chapter_lines_with_map(chapter_verses, width)[0]) without building the lines
+    return count_layout_lines(((vnum, text_layout(text)) for vnum, text in chapter_verses), width)
+
+def chapter_line_counter(bible):
+    # -> count(book, chapter, width); a corpus with stored layouts counts
+    # from those and leaves text_layout's cache alone
+    stored = getattr(bible, "chapter_line_count", None)
+    if stored is not None:
+        return stored
+    return lambda b, ch, width: count_chapter_lines(bible[b][ch], width)
+
+def count_layout_lines(verse_layouts, width):
+    # count_chapter_lines() over (verse, layout) pairs
+    total = 0
+    for vnum, layout in verse_layouts:
+        wrap_width = max(1, width - len(str(vnum)) - 1)
+        total += max(1, len(break_spans(layout, wrap_width))) + 1
+    return max(0, total - 1)
+
 def line_index_for_verse(chapter_verses, width, verse_num):
     lines, mapping = format_chapter_lines_with_map(chapter_verses, width)
     for i, v in enumerate(mapping):
@@ -540,6 +1238,80 @@ def prev_chapter(bible, book_key, chapter_num):
         return (pb, pch)
     return None
 
+# ---------- Continuous scrolling ----------
+class ContinuousDocument:
+    """
+    The whole text as one virtual list of lines at a fixed width. Every
+    chapter contributes a heading, its formatted lines and a blank line;
+    only chapters that are actually drawn get formatted.
+    """
+    def __init__(self, bible, chapters, width):
+        self.width = width
+        self.chapters = chapters
+        self.order = [(b, ch) for b, chs in bible.items() for ch in chs]
+        self.position = {key: i for i, key in enumerate(self.order)}
+        count = chapter_line_counter(bible)
+        self.starts = [0]
+        for b, ch in self.order:
+            self.starts.append(self.starts[-1] + count(b, ch, width) + 2)
+
+    def __len__(self):
+        return self.starts[-1]
+
+    def locate(self, line):
+        i = bisect_right(self.starts, line) - 1
+        return i, line - self.starts[i]
+
+    def line_of(self, book_key, chapter_num, local_line):
+        return self.starts[self.position[(book_key, chapter_num)]] + 1 + local_line
+
+    def line(self, line):
+        # (text, book, chapter, verse); verse is None for headings and blanks
+        i, off = self.locate(line)
+        b, ch = self.order[i]
+        if off == 0:
+            return f"{BOOK_NAMES.get(b, b)} {ch}", b, ch, None
+        _, lines, line_to_verse = self.chapters.get(b, ch, self.width)
+        if off - 1 < len(lines):
+            return lines[off - 1], b, ch, line_to_verse[off - 1]
+        return "", b, ch, None
+
+    def to_local(self, line, direction=0):
+        # Snap to (book, chapter, line within chapter). Headings and blanks
+        # clamp into their own chapter, except that moving down past a
+        # chapter's text or up onto its heading continues into the next or
+        # previous chapter, so small steps never stick at a boundary.
+        line = max(0, min(line, len(self) - 1))
+        i, off = self.locate(line)
+        n = self.starts[i + 1] - self.starts[i] - 2
+        if direction > 0 and off > n and i + 1 < len(self.order):
+            i, off = i + 1, 1
+        elif direction < 0 and off == 0 and i > 0:
+            i -= 1
+            off = self.starts[i + 1] - self.starts[i] - 2
+        n = self.starts[i + 1] - self.starts[i] - 2
+        b, ch = self.order[i]
+        return b, ch, max(0, min(off - 1, n - 1))
+
+    def _verse_at(self, line):
+        _, b, ch, v = self.line(line)
+        return None if v is None else (b, ch, v)
+
+    def move_to_verse_line(self, line, direction):
+        # move_cursor_to_verse_line() over the virtual document
+        last = len(self) - 1
+        current = self._verse_at(line)
+        i = line
+        if direction > 0:
+            while i < last and (self._verse_at(i) == current or self._verse_at(i) is None):
+                i += 1
+        else:
+            while i > 0 and (self._verse_at(i) == current or self._verse_at(i) is None):
+                i -= 1
+            while i > 0 and self._verse_at(i - 1) == self._verse_at(i):
+                i -= 1
+        return max(0, min(i, last))
+
 # ---------- Parsing references (fixed) ----------
 # Try in order to avoid swallowing chapter/verse into book token.
 RE_BOOK_CH_VRANGE = re.compile(
@@ -606,28 +1378,261 @@ def parse_reference_range(ref, current_book=None):
         return (code, None, None, None)
     return None
 
+# ---------- Global verse ids and passages ----------
+class VerseIndex:
+    """
+    Every verse in canonical order, numbered 0..n-1. A chapter's verses are a
+    contiguous id range, so any passage is a slice of the id space.
+    """
+    def __init__(self, bible):
+        self.chapter_start = {}
+        self.chapter_verses = {}
+        self.book_chapters = {}
+        self.refs = []
+        self.texts = []
+        for b, chapters in bible.items():
+            self.book_chapters[b] = list(chapters)
+            for ch, verses in chapters.items():
+                self.chapter_start[(b, ch)] = len(self.refs)
+                self.chapter_verses[(b, ch)] = [v for v, _ in verses]
+                for v, t in verses:
+                    self.refs.append((b, ch, v))
+                    self.texts.append(t)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # ids, verse numbers and texts stay in the mapped file
+        index = cls.__new__(cls)
+        index.chapter_start = {}
+        index.chapter_verses = {}
+        index.book_chapters = {}
+        index.refs = snapshot.refs
+        index.texts = snapshot.texts
+        for b, book in snapshot.items():
+            index.book_chapters[b] = list(book)
+            for ch, (first, n) in book.spans.items():
+                index.chapter_start[(b, ch)] = first
+                index.chapter_verses[(b, ch)] = snapshot.verse_nums[first:first + n]
+        return index
+
+    def __len__(self):
+        return len(self.refs)
+
+    def id_of(self, book_key, chapter_num, verse_num):
+        # Exact id of a verse, or None. Verses are normally numbered 1..n.
+        nums = self.chapter_verses.get((book_key, chapter_num))
+        if not nums:
+            return None
+        i = verse_num - 1
+        if not (0 <= i < len(nums) and nums[i] == verse_num):
+            i = bisect_left(nums, verse_num)
+            if i == len(nums) or nums[i] != verse_num:
+                return None
+        return self.chapter_start[(book_key, chapter_num)] + i
+
+    def chapter_span(self, book_key, chapter_num):
+        start = self.chapter_start[(book_key, chapter_num)]
+        return start, start + len(self.chapter_verses[(book_key, chapter_num)]) - 1
+
+    def nearest_chapter(self, book_key, chapter_num):
+        return _nearest(self.book_chapters[book_key], chapter_num)
+
+    def nearest_id(self, book_key, chapter_num, verse_num):
+        nums = self.chapter_verses[(book_key, chapter_num)]
+        return self.id_of(book_key, chapter_num, _nearest(nums, verse_num))
+
+    def verses(self, lo, hi):
+        # (book, chapter, verse, text) for ids lo..hi inclusive
+        for i in range(max(0, lo), min(hi, len(self.refs) - 1) + 1):
+            b, ch, v = self.refs[i]
+            yield (b, ch, v, self.texts[i])
+
+def _nearest(nums, n):
+    # Same pick as min(nums, key=lambda x: abs(x - n)) for sorted nums, in O(log n).
+    i = bisect_left(nums, n)
+    if i == 0:
+        return nums[0]
+    if i == len(nums):
+        return nums[-1]
+    return nums[i] if nums[i] - n < n - nums[i - 1] else nums[i - 1]
+
+_CORPUS_INDEXES = {}
+_CORPUS_LOCK = threading.Lock()
+
+def corpus_index(bible, build):
+    # Indexes derived from the parsed text are built once per bible object.
+    # Each index has its own lock, so a caller that asks while another thread
+    # (e.g. prepare_corpus) is building it waits for that build instead of
+    # starting a second one, without holding up unrelated indexes. A snapshot
+    # gets each index from its stored tables via build.from_snapshot.
+    if isinstance(bible, CorpusSnapshot):
+        build = getattr(build, "from_snapshot", build)
+    key = (build, id(bible))
+    with _CORPUS_LOCK:
+        entry = _CORPUS_INDEXES.get(key)
+        if entry is None or entry[0] is not bible:
+            entry = (bible, threading.Lock(), [])
+            _CORPUS_INDEXES[key] = entry
+    _, lock, built = entry
+    if not built:
+        with lock:
+            if not built:
+                built.append(build(bible))
+    return built[0]
+
+def verse_index(bible):
+    return corpus_index(bible, VerseIndex)
+
+RE_BOOK_PASSAGE = re.compile(
+    r"^\s*([0-9]{0,2}\s*[A-Za-z][A-Za-z ]+?)\s+(\d+)(?::(\d+))?\s*[-–—]\s*(\d+)(?::(\d+))?\s*$"
+)
+RE_REL_PASSAGE = re.compile(r"^\s*(\d+)(?::(\d+))?\s*[-–—]\s*(\d+)(?::(\d+))?\s*$")
+
+def parse_passage(ref, current_book=None):
+    """
+    Returns (book, ch1, v1, ch2, v2) or None. Missing parts are None:
+      "Gen 1:1-3:5" -> ("Ge", 1, 1, 3, 5)      "Ps 119-121" -> ("Ps", 119, None, 121, None)
+      "Joh 3:16-18" -> ("Joh", 3, 16, 3, 18)   "John 3"     -> ("Joh", 3, None, 3, None)
+      "Genesis"     -> ("Ge", None, None, None, None)
+    """
+    m = RE_BOOK_PASSAGE.match(ref)
+    book = None
+    if m:
+        book = normalize_book_token(m.group(1))
+        if not book:
+            return None
+        groups = m.groups()[1:]
+    else:
+        m = RE_REL_PASSAGE.match(ref)
+        if m and current_book:
+            book = current_book
+            groups = m.groups()
+    if book:
+        ch1, v1, x, y = [int(g) if g else None for g in groups]
+        if y is not None:
+            return (book, ch1, v1, x, y)
+        if v1 is not None:
+            return (book, ch1, v1, ch1, x)  # "3:16-18": end is a verse
+        return (book, ch1, None, x, None)   # "119-121": end is a chapter
+    parsed = parse_reference_range(ref, current_book=current_book)
+    if not parsed:
+        return None
+    book, ch, v1, v2 = parsed
+    return (book, ch, v1, ch, v2)
+
+def resolve_passage(bible, ref, current_book=None):
+    """
+    Resolve a reference to an inclusive (lo, hi) range of global verse ids,
+    snapping chapters and verses that do not exist to the nearest ones.
+    Returns None if the reference cannot be parsed or the book is missing.
+    """
+    parsed = parse_passage(ref, current_book=current_book)
+    if not parsed or parsed[0] not in bible:
+        return None
+    index = verse_index(bible)
+    book, ch1, v1, ch2, v2 = parsed
+    chapters = index.book_chapters[book]
+    if not chapters:
+        return None
+    ch1 = chapters[0] if ch1 is None else index.nearest_chapter(book, ch1)
+    ch2 = chapters[-1] if ch2 is None else index.nearest_chapter(book, ch2)
+    lo = index.chapter_span(book, ch1)[0] if v1 is None else index.nearest_id(book, ch1, v1)
+    hi = index.chapter_span(book, ch2)[1] if v2 is None else index.nearest_id(book, ch2, v2)
+    return (lo, hi) if lo <= hi else (hi, lo)
+
+def passage_verses(bible, ref, current_book=None):
+    span = resolve_passage(bible, ref, current_book=current_book)
+    if span is None:
+        raise ValueError(f"Could not resolve reference: {ref}")
+    return verse_index(bible).verses(*span)
+
 # ---------- Search ----------
+# Plain terms match as substrings. Quoted phrases (or single quoted words)
+# and proximity clauses match whole words by token position:
+#   faith NEAR/5 grace   both within 5 words of each other, either order
+#   faith PRE/5 grace    "faith" comes first, grace at most 5 words after
+WORD_RE = re.compile(r"[a-z]+")
+PROXIMITY_RE = re.compile(r"(NEAR|PRE)/(\d+)", re.I)
+
 def parse_query(q):
+    # Returns (terms, phrases, near); near holds (word, "near"|"pre", n, word).
+    # Raises ValueError for an operator without a plain word on both sides.
     phrases = re.findall(r'"([^"]+)"', q)
     remainder = re.sub(r'"[^"]+"', ' ', q)
-    terms = [w for w in re.split(r"\s+", remainder.strip()) if w]
-    return terms, phrases
-
-def match_verse(text, terms, phrases, mode="all"):
+    words = [w for w in re.split(r"\s+", remainder.strip()) if w]
+    terms = []
+    near = []
+    i = 0
+    while i < len(words):
+        m = PROXIMITY_RE.fullmatch(words[i + 1]) if i + 2 < len(words) else None
+        if not m:
+            if PROXIMITY_RE.fullmatch(words[i]):
+                raise ValueError(f"{words[i]} needs an unquoted word on each side")
+            terms.append(words[i])
+            i += 1
+            continue
+        near.append((_operand(words[i]), m.group(1).lower(), int(m.group(2)), _operand(words[i + 2])))
+        i += 2  # "a NEAR/2 b PRE/3 c": b is also the left side of the next clause
+        if not (i + 2 < len(words) and PROXIMITY_RE.fullmatch(words[i + 1])):
+            i += 1
+    return terms, phrases, near
+
+def _operand(word):
+    toks = WORD_RE.findall(word.lower())
+    return toks[0] if toks else word.lower()
+
+def verse_tokens(text):
+    return tuple(WORD_RE.findall(text.lower()))
+
+def _positions(tokens, words):
+    # word -> positions in tokens, for just the words asked about
+    found = {w: [] for w in words}
+    for i, tok in enumerate(tokens):
+        if tok in found:
+            found[tok].append(i)
+    return found
+
+def phrase_in_tokens(tokens, phrase_words):
+    # Intersect start positions: word k must sit at start + k.
+    pos = _positions(tokens, phrase_words)
+    starts = set(pos[phrase_words[0]])
+    for k, w in enumerate(phrase_words[1:], 1):
+        if not starts:
+            return False
+        starts.intersection_update(p - k for p in pos[w])
+    return bool(starts)
+
+def near_in_tokens(tokens, clause):
+    a, op, n, b = clause
+    pos = _positions(tokens, (a, b))
+    for pa in pos[a]:
+        for pb in pos[b]:
+            gap = pb - pa
+            if (0 < gap <= n) if op == "pre" else (gap != 0 and abs(gap) <= n):
+                return True
+    return False
+
+def match_verse(text, terms, phrases, mode="all", near=(), tokens=None):
     s = text.lower()
     t = [w.lower() for w in terms]
-    p = [ph.lower() for ph in phrases]
+    p = [(ph.lower(), verse_tokens(ph)) for ph in phrases]
+    if (p or near) and tokens is None:
+        tokens = verse_tokens(s)
+    # a phrase without letters ("3", ":") has no words to place; match it as text
+    phrase_ok = lambda ph: phrase_in_tokens(tokens, ph[1]) if ph[1] else ph[0] in s
+    near_ok = lambda clause: near_in_tokens(tokens, clause)
     if mode == "exact":
         if p:
-            return any(ph in s for ph in p)
+            return any(map(phrase_ok, p))
         mode = "all"
     if mode == "any":
-        return any((w in s) for w in t) or any((ph in s) for ph in p)
-    return all((w in s) for w in t) and all((ph in s) for ph in p)
+        return any((w in s) for w in t) or any(map(phrase_ok, p)) or any(map(near_ok, near))
+    return all((w in s) for w in t) and all(map(phrase_ok, p)) and all(map(near_ok, near))
 
-def make_snippet(text, terms, phrases, width=80):
+def make_snippet(text, terms, phrases, width=80, forms=()):
+    # forms: extra surface words (e.g. from a stem search) to centre the snippet on
     s = text
-    keys = [w.lower() for w in terms] + [ph.lower() for ph in phrases]
+    keys = [w.lower() for w in terms] + [ph.lower() for ph in phrases] + [f.lower() for f in forms]
     idx = -1
     ls = s.lower()
     for k in keys:
@@ -642,25 +1647,442 @@ def make_snippet(text, terms, phrases, width=80):
     suffix = "..." if end < len(s) else ""
     return (prefix + s[start:end] + suffix).replace("\n", " ")
 
-def search_bible(bible, query, mode="all"):
-    terms, phrases = parse_query(query)
-    results = []
+class PositionalIndex:
+    """
+    Word tokens of every verse (by global verse id) and, per word, the
+    ascending ids of the verses containing it. Phrase and proximity queries
+    intersect the id lists, then check positions in the surviving verses.
+    """
+    def __init__(self, bible):
+        interned = {}
+        self.tokens = []
+        postings = defaultdict(list)
+        for vid, text in enumerate(verse_index(bible).texts):
+            toks = tuple(interned.setdefault(w, w) for w in verse_tokens(text))
+            self.tokens.append(toks)
+            for w in set(toks):
+                postings[w].append(vid)
+        self.postings = dict(postings)
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # postings come from the mapped file; tokens are redone per candidate
+        index = cls.__new__(cls)
+        index.postings = snapshot.postings
+        index.tokens = SnapshotTokens(snapshot)
+        return index
+
+    def candidates(self, words):
+        # ids of verses containing every word, in ascending order
+        lists = sorted((self.postings.get(w, ()) for w in set(words)), key=len)
+        if not lists:
+            return []
+        hits = set(lists[0])
+        for ids in lists[1:]:
+            hits.intersection_update(ids)
+        return sorted(hits)
+
+def positional_index(bible):
+    return corpus_index(bible, PositionalIndex)
+
+def _required_words(phrases, near, mode):
+    # Words every match must contain, or None if the query guarantees none.
+    if mode == "exact" and phrases:
+        return verse_tokens(phrases[0]) if len(phrases) == 1 else None
+    if mode in ("all", "exact"):
+        return [w for ph in phrases for w in verse_tokens(ph)] + near_words(near) or None
+    return None
+
+def iter_search(bible, terms, phrases, mode="all", near=()):
+    # Queries with phrases or proximity clauses only look at the verses that
+    # contain their words; anything else is a full scan.
+    required = _required_words(phrases, near, mode)
+    if required:
+        index = verse_index(bible)
+        pindex = positional_index(bible)
+        for vid in pindex.candidates(required):
+            b, ch, v = index.refs[vid]
+            text = index.texts[vid]
+            if match_verse(text, terms, phrases, mode=mode, near=near, tokens=pindex.tokens[vid]):
+                yield (b, ch, v, text)
+        return
     for bkey, chapters in bible.items():
         for ch, verses in chapters.items():
             for vnum, vtext in verses:
-                if match_verse(vtext, terms, phrases, mode=mode):
-                    results.append((bkey, ch, vnum, vtext))
-    return results, terms, phrases
+                if match_verse(vtext, terms, phrases, mode=mode, near=near):
+                    yield (bkey, ch, vnum, vtext)
+
+def near_words(near):
+    # proximity operands, for snippets
+    return [w for a, _, _, b in near for w in (a, b)]
+
+def search_bible(bible, query, mode="all"):
+    if mode == "fuzzy":
+        return fuzzy_search(bible, query)[:3]
+    if mode == "stem":
+        return stem_search(bible, query)[:3]
+    terms, phrases, near = parse_query(query)
+    results = list(iter_search(bible, terms, phrases, mode=mode, near=near))
+    return results, terms + near_words(near), phrases
+
+# ---------- Fuzzy search ----------
+FUZZY_MIN_LEN = 3
+
+def _deletions(word, max_edits):
+    # word plus every string made by deleting up to max_edits characters
+    found = {word}
+    edge = {word}
+    for _ in range(max_edits):
+        edge = {w[:i] + w[i + 1:] for w in edge if len(w) > 1 for i in range(len(w))} - found
+        found |= edge
+    return found
+
+def edit_distance(a, b, limit):
+    # Optimal string alignment distance (adjacent swaps cost 1); limit + 1 once over limit.
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2 = None
+    prev = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        cur = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+class Lexicon:
+    """
+    Corpus vocabulary with a symmetric-deletion index: each word is filed
+    under every string reachable by deleting up to max_edits characters, so
+    a misspelling finds its candidates by looking up its own deletions.
+    """
+    def __init__(self, bible, max_edits=2):
+        self.max_edits = max_edits
+        self.counts = Counter()
+        for chapters in bible.values():
+            for verses in chapters.values():
+                for _, text in verses:
+                    self.counts.update(WORD_RE.findall(text.lower()))
+        deletes = defaultdict(list)
+        for word in self.counts:
+            for d in _deletions(word, max_edits):
+                deletes[d].append(word)
+        # most deletions belong to a single word; store those as a bare str
+        self.deletes = {d: ws[0] if len(ws) == 1 else tuple(ws) for d, ws in deletes.items()}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        # word counts and deletions come from the mapped file
+        lex = cls.__new__(cls)
+        lex.max_edits = snapshot.max_edits
+        lex.counts = snapshot.word_counts
+        lex.deletes = snapshot.deletions
+        return lex
+
+    def __contains__(self, word):
+        return word in self.counts
+
+    def correct(self, word):
+        # Best known word within the edit budget, or None.
+        if word in self.counts:
+            return word
+        limit = 1 if len(word) <= 4 else self.max_edits
+        candidates = set()
+        for d in _deletions(word, limit):
+            found = self.deletes.get(d)
+            if isinstance(found, str):
+                candidates.add(found)
+            elif found:
+                candidates.update(found)
+        best = None
+        for cand in candidates:
+            dist = edit_distance(word, cand, limit)
+            if dist <= limit:
+                rank = (dist, -self.counts[cand], cand)
+                if best is None or rank < best:
+                    best = rank
+        return best[2] if best else None
+
+def lexicon(bible):
+    return corpus_index(bible, Lexicon)
+
+def correct_terms(bible, terms, phrases, near=()):
+    """
+    Replace words the corpus does not contain with their closest corpus word.
+    Returns (terms, phrases, near, substitutions) where substitutions is a
+    list of (typed, corrected) pairs.
+    """
+    lex = lexicon(bible)
+    subs = []
+
+    def fix(word):
+        w = word.lower()
+        if len(w) < FUZZY_MIN_LEN or not WORD_RE.fullmatch(w) or w in lex:
+            return word
+        better = lex.correct(w)
+        if better is None:
+            return word
+        subs.append((word, better))
+        return better
+
+    terms = [fix(t) for t in terms]
+    phrases = [" ".join(fix(w) for w in ph.split()) for ph in phrases]
+    fixed = {}
+    for a, _, _, b in near:
+        for w in (a, b):
+            if w not in fixed:
+                fixed[w] = fix(w)
+    near = [(fixed[a], op, n, fixed[b]) for a, op, n, b in near]
+    return terms, phrases, near, subs
+
+# ---------- Stem search ----------
+# Irregular and archaic forms mapped to a base word; the base is then stemmed
+# like any other word, so "saith", "said" and "sayest" all meet at "say".
+STEM_IRREGULAR = {
+    "saith": "say", "said": "say", "saidst": "say",
+    "spake": "speak", "spakest": "speak", "spoken": "speak",
+    "hath": "have", "hast": "have", "had": "have", "hadst": "have", "having": "have",
+    "doth": "do", "doeth": "do", "doest": "do", "dost": "do", "does": "do", "did": "do", "didst": "do",
+    "done": "do", "doing": "do",
+    "is": "be", "am": "be", "are": "be", "art": "be", "was": "be", "wast": "be", "were": "be",
+    "wert": "be", "been": "be", "being": "be",
+    "shalt": "shall", "should": "shall", "shouldest": "shall",
+    "wilt": "will", "would": "will", "wouldest": "will",
+    "canst": "can", "could": "can", "couldest": "can",
+    "mayest": "may", "might": "may", "mightest": "may",
+    "came": "come", "camest": "come", "went": "go", "wentest": "go", "gone": "go", "goes": "go",
+    "goeth": "go", "goest": "go", "going": "go",
+    # stems too short for the suffix rules
+    "died": "die", "dieth": "die", "diest": "die", "dying": "die",
+    "lieth": "lie", "liest": "lie", "lied": "lie", "lying": "lie",
+    "ran": "run", "fleddest": "flee",
+    "gave": "give", "gavest": "give", "given": "give",
+    "took": "take", "tookest": "take", "taken": "take",
+    "knew": "know", "knewest": "know", "known": "know",
+    "saw": "see", "sawest": "see", "seen": "see", "seeth": "see", "seest": "see",
+    "brought": "bring", "broughtest": "bring", "begat": "beget", "begotten": "beget",
+    "sat": "sit", "sware": "swear", "sworn": "swear", "thought": "think", "taught": "teach",
+    "sought": "seek", "bought": "buy", "found": "find", "made": "make", "madest": "make",
+    "heard": "hear", "heardest": "hear", "ate": "eat", "eaten": "eat",
+    "slew": "slay", "slain": "slay", "forsook": "forsake", "forsaken": "forsake",
+    "arose": "arise", "risen": "rise", "wrought": "work", "stood": "stand",
+    "understood": "understand", "fell": "fall", "fallen": "fall", "bare": "bear", "borne": "bear",
+    "dwelt": "dwell", "sent": "send", "sentest": "send", "built": "build", "kept": "keep",
+    "slept": "sleep", "wept": "weep", "led": "lead", "fled": "flee", "fed": "feed",
+    "men": "man", "women": "woman", "children": "child", "brethren": "brother",
+}
+# -est/-eth/-ing words that are not verb forms
+STEM_KEEP = {
+    "forest", "honest", "interest", "request", "harvest", "manifest", "modest", "earnest",
+    "priest", "breast", "evening", "nothing", "something", "everlasting", "blessing",
+}
+STEM_SUFFIXES = ("edst", "eth", "est", "ed", "ing", "es", "s")
+
+def kjv_stem(word):
+    w = STEM_IRREGULAR.get(word, word)
+    if w not in STEM_KEEP:
+        for suffix in STEM_SUFFIXES:
+            if not w.endswith(suffix) or len(w) - len(suffix) < 3:
+                continue
+            if suffix == "s" and w.endswith(("ss", "us", "is")):
+                break
+            w = w[:-len(suffix)]
+            if w.endswith("i") and suffix != "ing":
+                w = w[:-1] + "y"  # crieth, cried, cries -> cry
+            break
+    if len(w) > 3 and w.endswith("e"):
+        w = w[:-1]  # believe -> believ, to meet believeth/believed
+    if len(w) > 2 and w[-1] == w[-2] and w[-1] not in "lsz":
+        w = w[:-1]  # sitteth -> sit
+    return w
+
+class StemIndex:
+    """
+    stem -> ascending global verse ids containing any form of it, plus the
+    surface forms seen for each stem (for snippets and the results header).
+    """
+    def __init__(self, bible):
+        stems = {}
+        postings = defaultdict(list)
+        forms = defaultdict(set)
+        for vid, text in enumerate(verse_index(bible).texts):
+            verse_stems = set()
+            for word in set(WORD_RE.findall(text.lower())):
+                stem = stems.get(word)
+                if stem is None:
+                    stem = stems[word] = kjv_stem(word)
+                    forms[stem].add(word)
+                verse_stems.add(stem)
+            for stem in verse_stems:
+                postings[stem].append(vid)
+        self.postings = dict(postings)
+        self.forms = {stem: sorted(ws) for stem, ws in forms.items()}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        index = cls.__new__(cls)
+        index.postings = snapshot.stem_postings
+        index.forms = snapshot.stem_forms
+        return index
+
+    def lookup(self, word):
+        stem = kjv_stem(word)
+        return self.postings.get(stem, []), self.forms.get(stem, [])
+
+def stem_index(bible):
+    return corpus_index(bible, StemIndex)
+
+def iter_stem_search(bible, terms, phrases, forms=None, near=()):
+    # Every word of every term must appear in some form; phrases stay literal.
+    index = verse_index(bible)
+    stems = stem_index(bible)
+    words = [w for t in terms for w in WORD_RE.findall(t.lower())]
+    if not words:
+        yield from iter_search(bible, terms, phrases, mode="all", near=near)
+        return
+    lists = []
+    for w in words:
+        ids, seen = stems.lookup(w)
+        lists.append(ids)
+        if forms is not None:
+            forms.extend(f for f in seen if f not in forms)
+    lists.sort(key=len)
+    hits = set(lists[0])
+    for ids in lists[1:]:
+        hits.intersection_update(ids)
+    for vid in sorted(hits):
+        b, ch, v = index.refs[vid]
+        text = index.texts[vid]
+        if match_verse(text, [], phrases, mode="all", near=near):
+            yield (b, ch, v, text)
+
+def stem_search(bible, query):
+    # Returns (results, terms, phrases, forms) with forms the surface words matched.
+    terms, phrases, near = parse_query(query)
+    forms = []
+    results = list(iter_stem_search(bible, terms, phrases, forms=forms, near=near))
+    return results, terms + near_words(near), phrases, forms
+
+def fuzzy_search(bible, query):
+    # Returns (results, terms, phrases, substitutions); matching is as for "all".
+    terms, phrases, near = parse_query(query)
+    terms, phrases, near, subs = correct_terms(bible, terms, phrases, near)
+    results = list(iter_search(bible, terms, phrases, mode="all", near=near))
+    return results, terms + near_words(near), phrases, subs
+
+# ---------- Export ----------
+# Exports stream (book, chapter, verse, text) records through a generator of
+# text pieces and write them out in chunks, so memory use stays flat.
+EXPORT_FORMATS = ("text", "jsonl", "html")
+EXPORT_CHUNK = 1 << 16
+
+def export_format_for(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".json"):
+        return "jsonl"
+    if ext in (".html", ".htm"):
+        return "html"
+    return "text"
+
+def iter_book_verses(bible, book_key):
+    for ch, verses in bible[book_key].items():
+        for vnum, vtext in verses:
+            yield (book_key, ch, vnum, vtext)
+
+def iter_all_verses(bible):
+    for bkey in bible:
+        yield from iter_book_verses(bible, bkey)
+
+def iter_reference_verses(bible, ref, current_book=None):
+    return passage_verses(bible, ref, current_book=current_book)
+
+def iter_favorite_verses(bible, favorites):
+    index = verse_index(bible)
+    for b, ch, v in favorites:
+        vid = index.id_of(b, ch, v)
+        if vid is not None:
+            yield (b, ch, v, index.texts[vid])
+
+def render_export(records, fmt="text"):
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    if fmt == "html":
+        yield ("<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>KJV export</title></head>\n"
+               "<body>\n")
+    for bkey, ch, v, text in records:
+        name = BOOK_NAMES.get(bkey, bkey)
+        if fmt == "jsonl":
+            yield json.dumps({"book": bkey, "name": name, "chapter": ch, "verse": v, "text": text},
+                             ensure_ascii=False) + "\n"
+        elif fmt == "html":
+            yield (f"<p id=\"{html.escape(verse_key(bkey, ch, v))}\"><b>{html.escape(name)} {ch}:{v}</b> "
+                   f"{html.escape(text)}</p>\n")
+        else:
+            yield f"{name} {ch}:{v} {text}\n"
+    if fmt == "html":
+        yield "</body></html>\n"
+
+def export_verses(records, out, fmt="text"):
+    # Writes to the open text stream 'out'; returns the number of verses written.
+    written = [0]
+
+    def counted():
+        for rec in records:
+            written[0] += 1
+            yield rec
+
+    buf = []
+    size = 0
+    for piece in render_export(counted(), fmt):
+        buf.append(piece)
+        size += len(piece)
+        if size >= EXPORT_CHUNK:
+            out.write("".join(buf))
+            buf.clear()
+            size = 0
+    if buf:
+        out.write("".join(buf))
+    return written[0]
+
+def export_to_file(records, path, fmt=None):
+    with open(path, "w", encoding="utf-8") as f:
+        return export_verses(records, f, fmt or export_format_for(path))
+
+def export_source(bible, source, favorites=None, current_book=None, mode="all"):
+    # source: "favorites", "/query", "all", or a reference ("John 3", "Genesis")
+    s = source.strip()
+    if s.lower() == "favorites":
+        return iter_favorite_verses(bible, favorites if favorites is not None else load_favorites())
+    if s.startswith("/"):
+        terms, phrases, near = parse_query(s[1:])
+        if mode == "fuzzy":
+            terms, phrases, near, _ = correct_terms(bible, terms, phrases, near)
+            mode = "all"
+        if mode == "stem":
+            return iter_stem_search(bible, terms, phrases, near=near)
+        return iter_search(bible, terms, phrases, mode=mode, near=near)
+    if s.lower() == "all":
+        return iter_all_verses(bible)
+    return iter_reference_verses(bible, s, current_book=current_book)
 
 # ---------- UI helpers ----------
-def choose_book_chapter(stdscr, bible, current=None):
-    book_keys = list(bible.keys())
+def choose_book(stdscr, book_keys, current=None):
     items = [f"{BOOK_NAMES.get(k, k)} ({k})" for k in book_keys]
-    start_idx = book_keys.index(current[0]) if current and current[0] in book_keys else 0
+    start_idx = book_keys.index(current) if current in book_keys else 0
     idx, _ = menu(stdscr, "Select book", "Choose a book:", items, width=48, start_index=start_idx)
     if idx is None:
+        return None
+    return book_keys[idx]
+
+def choose_book_chapter(stdscr, bible, current=None):
+    book_key = choose_book(stdscr, list(bible.keys()), current=current[0] if current else None)
+    if book_key is None:
         return (None, None)
-    book_key = book_keys[idx]
     ch = choose_chapter(stdscr, bible, book_key, current=current[1] if current and current[0]==book_key else None)
     if ch is None:
         return (None, None)
@@ -680,72 +2102,94 @@ def choose_search_mode(stdscr):
     items = [
         "All terms and phrases (AND)",
         "Any term or phrase (OR)",
-        'Exact phrase match (use "quotes")'
+        'Exact phrase match (use "quotes")',
+        "All terms, correcting misspelt words (fuzzy)",
+        "All terms in any word form (believe, believeth...)"
     ]
     idx, _ = menu(stdscr, "Search mode", "Select how to match your query:", items, width=56, height=12)
     if idx is None:
         return None
-    return ["all", "any", "exact"][idx]
+    return ["all", "any", "exact", "fuzzy", "stem"][idx]
 
-def show_search_results(stdscr, results, terms, phrases):
+def show_search_results(stdscr, results, terms, phrases, note="", forms=()):
     items = []
     for bkey, ch, v, text in results:
         bk = BOOK_NAMES.get(bkey, bkey)
-        snippet = make_snippet(text, terms, phrases, width=80)
+        snippet = make_snippet(text, terms, phrases, width=80, forms=forms)
         items.append(f"{bk} {ch}:{v} — {snippet}")
-    idx, _ = menu(stdscr, "Search results", f"{len(results)} matches. Select a verse:", items,
+    header = f"{len(results)} matches. Select a verse:"
+    if note:
+        header = f"{note}\n{header}"
+    idx, _ = menu(stdscr, "Search results", header, items,
                   width=90, height=min(28, 10 + len(items)))
     if idx is None:
         return None
     return results[idx]
 
 def jump_to_reference_prompt(stdscr, bible, current_book, current_chapter):
+    # Returns an inclusive (lo, hi) range of global verse ids, or None.
     ref, ok = inputbox(
         stdscr,
         "Jump to",
-        'Enter reference (e.g. "John 3:16", "Joh 3:16-18", "John 3", "Genesis", "3:16", "3"):'
+        'Enter reference (e.g. "John 3:16", "Joh 3:16-18", "Gen 1:1-3:5", "Ps 119-121", "Genesis", "3:16", "3"):'
     )
     if not ok or not ref.strip():
         return None
-    parsed = parse_reference_range(ref, current_book=current_book)
+    parsed = parse_passage(ref, current_book=current_book)
     if not parsed:
         msgbox(stdscr, "Not found", "Could not parse that reference.")
         return None
-    bkey, ch, v1, v2 = parsed
-    if bkey not in bible:
+    bkey = parsed[0]
+    if bkey not in bible or not bible[bkey]:
         msgbox(stdscr, "Not found", f"Book '{bkey}' not in text.")
         return None
-
-    chapters = bible[bkey]
-    if ch is None:
-        ch = list(chapters.keys())[0]
-        verses = [vn for vn, _ in chapters[ch]]
-        hl = set(verses)
-        return (bkey, ch, hl)
-    if ch not in chapters:
-        chs = list(chapters.keys())
-        ch = min(chs, key=lambda n: abs(n - ch))
-    verses = [vn for vn, _ in chapters[ch]]
-    if v1 is None:
-        hl = set(verses)
-        return (bkey, ch, hl)
-    if v2 is None:
-        v2 = v1
-    v1c = min(verses, key=lambda n: abs(n - v1))
-    v2c = min(verses, key=lambda n: abs(n - v2))
-    lo, hi = sorted((v1c, v2c))
-    hl = {vn for vn in verses if lo <= vn <= hi}
-    return (bkey, ch, hl)
+    if parsed[1] is None:
+        # A bare book name opens its first chapter
+        return verse_index(bible).chapter_span(bkey, next(iter(bible[bkey])))
+    return resolve_passage(bible, ref, current_book=current_book)
+
+def export_prompt(stdscr, bible, favorites, current_book, current_chapter):
+    default = f"{BOOK_NAMES.get(current_book, current_book)} {current_chapter}"
+    source, ok = inputbox(
+        stdscr,
+        "Export",
+        'What to export: a reference ("John 3", "Genesis"), "favorites", "all", or "/query":',
+        initial=default
+    )
+    if not ok or not source.strip():
+        return
+    path, ok = inputbox(stdscr, "Export", "File name (.txt, .jsonl or .html):", initial="kjv_export.txt")
+    if not ok or not path.strip():
+        return
+    path = os.path.expanduser(path.strip())
+    try:
+        records = export_source(bible, source, favorites=favorites, current_book=current_book)
+        n = export_to_file(records, path)
+    except (ValueError, OSError) as e:
+        msgbox(stdscr, "Export failed", str(e))
+        return
+    msgbox(stdscr, "Exported", f"Wrote {n} verses to {path}.")
 
 # ---------- Reader ----------
-def reader(stdscr, bible, book_key, chapter_num):
+def reader(stdscr, bible, book_key, chapter_num, chapters=None):
+    chapters = chapters or ChapterCache(bible)
+    try:
+        _reader_loop(stdscr, bible, book_key, chapter_num, chapters)
+    finally:
+        chapters.close()
+
+def _reader_loop(stdscr, bible, book_key, chapter_num, chapters):
     curses.curs_set(0)
     init_colors()
     favorites = load_favorites()
 
+    index = verse_index(bible)
     highlight_enabled = True
-    highlight_set = set()
+    highlight = None  # inclusive (lo, hi) range of global verse ids
     cursor_line = 0
+    prefetched = None
+    continuous = False
+    doc = None
 
     while True:
         stdscr.clear()
@@ -761,26 +2205,44 @@ def reader(stdscr, bible, book_key, chapter_num):
 
         inner_h = max(1, maxy - 6)
         inner_w = max(1, maxx - 4)
-        chapter, content_lines, line_to_verse = load_chapter_lines(bible, book_key, chapter_num, inner_w)
-        top = max(0, min(cursor_line, len(content_lines) - inner_h))
+        chapter, content_lines, line_to_verse = chapters.get(book_key, chapter_num, inner_w)
+        if continuous:
+            if doc is None or doc.width != inner_w:
+                # counting every chapter's lines is slow until the layouts are warm
+                doc = wait_with_message(stdscr, BackgroundTask(ContinuousDocument, bible, chapters, inner_w),
+                                        "Laying out the whole text...")
+            cursor_line = min(cursor_line, max(0, len(content_lines) - 1))
+            cursor_at = doc.line_of(book_key, chapter_num, cursor_line)
+            # keep one line above the cursor so chapter headings stay visible
+            top = max(0, min(cursor_at - 1, len(doc) - inner_h))
+            row_source = lambda i: doc.line(i) if i < len(doc) else None
+        else:
+            cursor_at = cursor_line
+            top = max(0, min(cursor_line, len(content_lines) - inner_h))
+            row_source = lambda i: ((content_lines[i], book_key, chapter_num, line_to_verse[i])
+                                    if i < len(content_lines) else None)
 
-        help_line = "Arrows: scroll  PgUp/PgDn  Home/End  ←/→: ch  B: book  c: chapter  v: jump  /: search  h: highlight  f: favorite  d: delete  b: bookmarks  q: quit"
+        help_line = "Arrows: scroll  PgUp/PgDn  Home/End  ←/→: ch  B: book  c: chapter  C: continuous  v: jump  /: search  h: highlight  f: favorite  d: delete  b: bookmarks  x: export  q: quit"
 
         for row in range(inner_h):
             y = 2 + row
             clear_interior_line(win, y, 2, inner_w)
             i = top + row
-            if 0 <= i < len(content_lines):
-                line = content_lines[i]
-                vnum = line_to_verse[i]
+            shown = row_source(i) if i >= 0 else None
+            if shown is not None:
+                line, bkey, chnum, vnum = shown
                 attr = curses.A_NORMAL
-                if highlight_enabled and vnum is not None and vnum in highlight_set:
+                if continuous and vnum is None and line:
+                    attr = curses.color_pair(CP_TITLE) | curses.A_BOLD
+                vid = index.id_of(bkey, chnum, vnum) if highlight_enabled and highlight and vnum is not None else None
+                if vid is not None and highlight[0] <= vid <= highlight[1]:
                     attr = curses.color_pair(CP_HL) | curses.A_BOLD
-                if vnum is not None and (book_key, chapter_num, vnum) in favorites:
-                    color_id = favorites[(book_key, chapter_num, vnum)]["color"]
+                fav = favorites.chapter(bkey, chnum).get(vnum) if vnum is not None else None
+                if fav is not None:
+                    color_id = fav["color"]
                     curses.init_pair(100 + color_id, curses.COLOR_BLACK, color_id)
                     attr = curses.color_pair(100 + color_id)
-                if i == cursor_line:
+                if i == cursor_at:
                     attr = curses.color_pair(CP_CURSOR)
                 try:
                     win.addnstr(y, 2, line, inner_w, attr)
@@ -788,7 +2250,9 @@ def reader(stdscr, bible, book_key, chapter_num):
                     pass
 
         status = f"{BOOK_NAMES.get(book_key, book_key)} {chapter_num}  ({len(content_lines)} lines)"
-        hl_status = "HL ON" if highlight_enabled and highlight_set else "HL OFF"
+        if continuous:
+            status += "  CONTINUOUS"
+        hl_status = "HL ON" if highlight_enabled and highlight else "HL OFF"
         try:
             clear_interior_line(win, maxy - 3, 2, inner_w)
             clear_interior_line(win, maxy - 2, 2, inner_w)
@@ -804,10 +2268,26 @@ def reader(stdscr, bible, book_key, chapter_num):
         except curses.error:
             pass
 
+        # Warm the neighbouring chapters while waiting for the next key.
+        if prefetched != (book_key, chapter_num, inner_w):
+            prefetched = (book_key, chapter_num, inner_w)
+            chapters.prefetch(book_key, chapter_num, inner_w)
+
         ch = win.getch()
         page = max(1, inner_h - 1)
 
-        if ch in (curses.KEY_UP, ord('k')):
+        if continuous and ch in (curses.KEY_UP, ord('k'), curses.KEY_DOWN, ord('j'),
+                                 curses.KEY_PPAGE, curses.KEY_NPAGE):
+            if ch in (curses.KEY_UP, ord('k')):
+                target = doc.move_to_verse_line(cursor_at, -1)
+            elif ch in (curses.KEY_DOWN, ord('j')):
+                target = doc.move_to_verse_line(cursor_at, 1)
+            elif ch == curses.KEY_PPAGE:
+                target = cursor_at - page
+            else:
+                target = cursor_at + page
+            book_key, chapter_num, cursor_line = doc.to_local(target, target - cursor_at)
+        elif ch in (curses.KEY_UP, ord('k')):
             cursor_line = move_cursor_to_verse_line(line_to_verse, cursor_line, -1)
         elif ch in (curses.KEY_DOWN, ord('j')):
             cursor_line = move_cursor_to_verse_line(line_to_verse, cursor_line, 1)
@@ -825,51 +2305,72 @@ def reader(stdscr, bible, book_key, chapter_num):
             prev = prev_chapter(bible, book_key, chapter_num)
             if prev:
                 book_key, chapter_num = prev
-                highlight_set = set()
+                highlight = None
                 cursor_line = 0
         elif ch == curses.KEY_RIGHT:
             nxt = next_chapter(bible, book_key, chapter_num)
             if nxt:
                 book_key, chapter_num = nxt
-                highlight_set = set()
+                highlight = None
                 cursor_line = 0
         elif ch == ord('B'):
             bk, chnum = choose_book_chapter(stdscr, bible, current=(book_key, chapter_num))
             if bk is not None:
                 book_key, chapter_num = bk, chnum
-                highlight_set = set()
+                highlight = None
                 cursor_line = 0
         elif ch == ord('c'):
             chnum = choose_chapter(stdscr, bible, book_key, current=chapter_num)
             if chnum is not None:
                 chapter_num = chnum
-                highlight_set = set()
+                highlight = None
                 cursor_line = 0
+        elif ch == ord('C'):
+            continuous = not continuous
         elif ch == ord('h'):
             highlight_enabled = not highlight_enabled
         elif ch == ord('v'):
             jump = jump_to_reference_prompt(stdscr, bible, book_key, chapter_num)
             if jump:
-                book_key, chapter_num, highlight_set = jump
-                chapter, content_lines, line_to_verse = load_chapter_lines(bible, book_key, chapter_num, inner_w)
-                first_v = min(highlight_set)
+                highlight = jump
+                book_key, chapter_num, first_v = index.refs[jump[0]]
+                chapter, content_lines, line_to_verse = chapters.get(book_key, chapter_num, inner_w)
                 cursor_line = line_index_for_verse(chapter, inner_w, first_v)
+                # show a passage that spans chapters as one scrollable span
+                if index.refs[jump[1]][:2] != (book_key, chapter_num):
+                    continuous = True
         elif ch == ord('/'):
-            q, ok = inputbox(stdscr, "Search", 'Enter query. Use quotes for phrases, e.g. "in the beginning" faith:')
+            q, ok = inputbox(stdscr, "Search", 'Enter query. Quotes match whole words or phrases, NEAR/n and PRE/n match words within n, e.g. "in the beginning" faith NEAR/5 grace:')
             if not ok or not q.strip():
                 continue
             mode = choose_search_mode(stdscr)
             if mode is None:
                 continue
-            results, terms, phrases = search_bible(bible, q, mode=mode)
+            note = ""
+            forms = []
+            try:
+                if mode == "fuzzy":
+                    results, terms, phrases, subs = fuzzy_search(bible, q)
+                    if subs:
+                        note = "Corrected: " + ", ".join(f"{a} → {b}" for a, b in subs)
+                elif mode == "stem":
+                    results, terms, phrases, forms = stem_search(bible, q)
+                    if forms:
+                        note = "Forms: " + ", ".join(forms)
+                else:
+                    results, terms, phrases = search_bible(bible, q, mode=mode)
+            except ValueError as e:
+                msgbox(stdscr, "Search", str(e))
+                continue
             if not results:
-                msgbox(stdscr, "No results", "No verses matched your query.")
+                msgbox(stdscr, "No results", "\n".join(filter(None, (note, "No verses matched your query."))))
                 continue
-            pick = show_search_results(stdscr, results, terms, phrases)
+            pick = show_search_results(stdscr, results, terms, phrases, note=note, forms=forms)
             if pick:
                 book_key, chapter_num, verse_num, _ = pick
-                highlight_set = {verse_num}
-                chapter, content_lines, line_to_verse = load_chapter_lines(bible, book_key, chapter_num, inner_w)
+                vid = index.id_of(book_key, chapter_num, verse_num)
+                highlight = (vid, vid)
+                chapter, content_lines, line_to_verse = chapters.get(book_key, chapter_num, inner_w)
                 cursor_line = line_index_for_verse(chapter, inner_w, verse_num)
         elif ch == ord('f'):
             verse_num = line_to_verse[cursor_line]
@@ -888,6 +2389,8 @@ def reader(stdscr, bible, book_key, chapter_num):
                         msgbox(stdscr, "Copied", "Verse text copied to clipboard.")
                     except ImportError:
                         msgbox(stdscr, "Error", "pyperclip not installed.")
+        elif ch == ord('x'):
+            export_prompt(stdscr, bible, favorites, book_key, chapter_num)
         elif ch == ord('d'):
             verse_num = line_to_verse[cursor_line]
             key = (book_key, chapter_num, verse_num)
@@ -898,38 +2401,104 @@ def reader(stdscr, bible, book_key, chapter_num):
         elif ch == ord('b'):
             result = show_favorites_menu(stdscr, bible, favorites)
             if result:
-                book_key, chapter_num, highlight_set = result
-                chapter, content_lines, line_to_verse = load_chapter_lines(bible, book_key, chapter_num, inner_w)
-                first_v = min(highlight_set)
+                book_key, chapter_num, verses = result
+                first_v = min(verses)
+                vid = index.id_of(book_key, chapter_num, first_v)
+                # the favorite may name a verse this text does not have
+                highlight = (vid, vid) if vid is not None else None
+                chapter, content_lines, line_to_verse = chapters.get(book_key, chapter_num, inner_w)
                 cursor_line = line_index_for_verse(chapter, inner_w, first_v)
         elif ch == curses.KEY_RESIZE:
             continue
 
 # ---------- App entry ----------
-def main(stdscr, path):
-    curses.curs_set(0)
-    init_colors()
+def wait_with_message(stdscr, task, msg):
+    # task.result(), with msg on screen if it is not ready almost at once
+    if not task.wait(0.05):
+        stdscr.clear()
+        maxy, maxx = stdscr.getmaxyx()
+        try:
+            stdscr.addnstr(maxy // 2, max(0, (maxx - len(msg)) // 2), msg, max(0, maxx - 1))
+            stdscr.refresh()
+        except curses.error:
+            pass
+    return task.result()
+
+def wait_for_bible(stdscr, loading):
     try:
-        bible = parse_kjv(path)
+        return wait_with_message(stdscr, loading, "Loading KJV text...")
     except Exception as e:
         msgbox(stdscr, "Error", f"Failed to parse file:\n{e}")
+        return None
+
+def main(stdscr, path, snapshot=None):
+    curses.curs_set(0)
+    init_colors()
+    # Parse while the first book menu is up; it only needs the static book order.
+    loading = BackgroundTask(open_corpus, path, snapshot)
+    book_key = choose_book(stdscr, list(BOOK_NAMES))
+    if book_key is None:
+        return
+    bible = wait_for_bible(stdscr, loading)
+    if bible is None:
         return
-    start = choose_book_chapter(stdscr, bible, current=None)
-    if start == (None, None):
+    if book_key in bible:
+        chapter_num = choose_chapter(stdscr, bible, book_key)
+    else:
+        book_key, chapter_num = choose_book_chapter(stdscr, bible, current=None)
+    if chapter_num is None:
         return
-    book_key, chapter_num = start
+    BackgroundTask(prepare_corpus, bible)
     reader(stdscr, bible, book_key, chapter_num)
 
+def export_main(args):
+    try:
+        bible = open_corpus(args.path, args.snapshot)
+    except Exception as e:
+        print(f"Failed to parse file: {e}", file=sys.stderr)
+        return 1
+    if args.search is not None:
+        source = "/" + args.search
+    elif args.favorites:
+        source = "favorites"
+    else:
+        source = args.export
+    try:
+        records = export_source(bible, source, mode=args.mode)
+        if args.output and args.output != "-":
+            n = export_to_file(records, args.output, args.format)
+        else:
+            n = export_verses(records, sys.stdout, args.format or "text")
+    except (ValueError, OSError) as e:
+        print(f"Export failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Exported {n} verses.", file=sys.stderr)
+    return 0
+
 if __name__ == "__main__":
     # Set the default path to KJV.txt in the current directory
     default_path = os.path.join(os.path.dirname(__file__), 'KJV.txt')
 
-    # Use the provided path or the default path
-    path = sys.argv[1] if len(sys.argv) > 1 else default_path
+    parser = argparse.ArgumentParser(description="Minimal curses KJV reader.")
+    parser.add_argument("path", nargs="?", default=default_path, help="path to KJV.txt")
+    parser.add_argument("--export", metavar="REF",
+                        help='export without the UI: a reference ("John 3:16-18", "Genesis") or "all"')
+    parser.add_argument("--search", metavar="QUERY", help="export every verse matching QUERY")
+    parser.add_argument("--favorites", action="store_true", help="export saved favorites")
+    parser.add_argument("--mode", choices=("all", "any", "exact", "fuzzy", "stem"), default="all", help="search mode")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="output format (default: from file extension)")
+    parser.add_argument("-o", "--output", help="output file (default: stdout)")
+    parser.add_argument("--snapshot", metavar="FILE",
+                        help="read the text from a shared memory-mapped snapshot, building it first if missing or stale")
+    args = parser.parse_args()
+    path = args.path
 
     # Check if the file exists
-    if not os.path.isfile(path):
+    if not os.path.isfile(path) and not (args.snapshot and os.path.isfile(args.snapshot)):
         print(f"Error: The file '{path}' does not exist.")
         sys.exit(1)
 
-    curses.wrapper(lambda stdscr: main(stdscr, path))
+    if args.export is not None or args.search is not None or args.favorites:
+        sys.exit(export_main(args))
+
+    curses.wrapper(lambda stdscr: main(stdscr, path, args.snapshot))